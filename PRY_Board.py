@@ -1,20 +1,43 @@
 import dash
-from dash import dcc, html, dash_table, Input, Output, State, callback_context
+from dash import dcc, html, dash_table, Input, Output, State, callback_context, CeleryManager
+from celery import Celery
+from flask_caching import Cache
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, date
+import plotly.io as pio
+from datetime import date
 import numpy as np
+import functools
+import orjson
+import math
+import os
 import re
 import warnings
 
 # Suppress the dateutil warning
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+# Serialize figures and callback responses with orjson (Dash encodes responses through plotly.io)
+pio.json.config.default_engine = 'orjson'
+
 # Initialize the Dash app
 app = dash.Dash(__name__)
 app.title = "Prysmian Maritime Imports Dashboard"
 
+# WSGI entry point for serving the app with a production server
+server = app.server
+
+# Redis backs the shared result cache when it is configured
+REDIS_URL = os.environ.get('REDIS_URL')
+
+# Broker for the background dashboard callback, opt-in since it needs a running Celery worker
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL')
+
+# Computed callback results - shared by all workers through Redis when REDIS_URL is set
+CACHE_TIMEOUT = 300
+cache = Cache(server, config={'CACHE_TYPE': 'RedisCache', 'CACHE_REDIS_URL': REDIS_URL}
+              if REDIS_URL else {'CACHE_TYPE': 'SimpleCache', 'CACHE_THRESHOLD': 128})
+
 # Color Palette
 COLORS = {
     'night_black': '#191B27',
@@ -24,54 +47,158 @@ COLORS = {
     'light_green': '#22C70C'
 }
 
+# Background update indicator, hidden until a background dashboard update runs
+DASHBOARD_LOADING_STYLE = {'display': 'none', 'color': COLORS['light_blue'], 'textAlign': 'center'}
+
+# Background callback workers, started with `celery -A PRY_Board:celery_app worker`.
+# Without CELERY_BROKER_URL the dashboard callback runs in the web process as before.
+celery_app = Celery(__name__, broker=CELERY_BROKER_URL, backend=CELERY_BROKER_URL) if CELERY_BROKER_URL else None
+BACKGROUND_CALLBACK = {} if celery_app is None else {
+    'background': True,
+    'manager': CeleryManager(celery_app),
+    'running': [(Output('dashboard-loading', 'style'),
+                 {**DASHBOARD_LOADING_STYLE, 'display': 'block'}, DASHBOARD_LOADING_STYLE)]
+}
+
+# Chart template shared by every figure
+CHART_LAYOUT = {
+    'plot_bgcolor': COLORS['night_black'],
+    'paper_bgcolor': COLORS['night_black'],
+    'font': {'color': COLORS['light_gray'], 'family': 'Montserrat'},
+    'xaxis': {'gridcolor': COLORS['dark_gray']},
+    'yaxis': {'gridcolor': COLORS['dark_gray']}
+}
+CHART_TITLE_FONT = {'color': COLORS['light_blue'], 'size': 18, 'family': 'Montserrat'}
+
+# Titles of the volume, value, category, country and time-series charts, in output order
+CHART_TITLES = ("🏭 Top 10 Buyers by Volume", "💰 Top 10 Sellers by Value", "📦 Top 5 Categories Distribution",
+                "🌍 Top 10 Countries by Transaction Count", "📈 Trade Volume & Value Over Time")
+
+# Metric card styles
+METRIC_CARD_STYLE = {'width': '22%', 'display': 'inline-block'}
+METRIC_VALUE_STYLE_BLUE = {'color': COLORS['light_blue'], 'fontSize': '28px', 'margin': '0'}
+METRIC_VALUE_STYLE_GREEN = {'color': COLORS['light_green'], 'fontSize': '28px', 'margin': '0'}
+METRIC_LABEL_STYLE = {'color': COLORS['light_gray'], 'margin': '5px 0'}
+
+DATA_FILE = 'PRY_Dash.xlsx'
+
+# Cleaned data cache - bump the version whenever load_data output changes.
+# Point PRY_CACHE_DIR at a tmpfs such as /dev/shm to keep the cache file in RAM.
+CACHE_VERSION = 3
+CACHE_FILE = os.path.join(os.environ.get('PRY_CACHE_DIR', '.'), f'PRY_Dash.v{CACHE_VERSION}.parquet')
+
+# Columns read from the Excel sheet
+SOURCE_COLUMNS = ['Date', 'Shipper Declared', 'International Competitor', 'Domestic Competitor',
+                  'Country of Origin', 'HS Code', 'Category',
+                  'Metric Tons', 'Total calculated value ($)', 'Val/KG ($)']
+
+# Columns the dashboard reads after loading, also the columns of the transaction table
+DATA_COLUMNS = ['Date', 'Buyer', 'Seller', 'Country of Origin', 'HS Code', 'Category',
+                'Metric Tons', 'Total calculated value ($)', 'Val/KG ($)']
+
+# The only HS Codes the dashboard covers
+TARGET_HS_CODES = ['854442', '854449', '854460', '740311']
+
+# Text columns only used for equality filtering and grouping
+CATEGORY_COLUMNS = ['Buyer', 'Seller', 'HS Code', 'Country of Origin', 'Category']
+
+# MM/DD/YYYY as typed into the date filters
+DATE_INPUT_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+# One `{column} operator value` expression of a custom DataTable filter query
+TABLE_FILTER_RE = re.compile(r'\{(?P<column>[^}]+)\}\s*(?P<case>[si]?)'
+                             r'(?P<operator>>=|<=|!=|=|<|>|eq|ne|lt|le|gt|ge|contains|datestartswith)'
+                             r'\s*(?P<value>.*)')
+
+# A `{column} is blank` / `{column} is not nil` expression, DataTable's unary missing-value checks
+TABLE_FILTER_MISSING_RE = re.compile(r'\{(?P<column>[^}]+)\}\s*is\s+(?P<negate>not\s+)?(?P<check>blank|nil)')
+
+# DataTable comparison operators mapped to the Series methods implementing them
+TABLE_FILTER_COMPARISONS = {'=': 'eq', 'eq': 'eq', '!=': 'ne', 'ne': 'ne', '<': 'lt', 'lt': 'lt',
+                            '<=': 'le', 'le': 'le', '>': 'gt', 'gt': 'gt', '>=': 'ge', 'ge': 'ge'}
+
+# Points LTTB keeps from each time series, the chart draws the days picked for either series
+TIME_SERIES_POINTS = 1500
+
+# Company suffixes ignored when comparing names
+COMPANY_SUFFIX_RE = re.compile(r'\b(?:LTD|LLC|INC|CO|COMPANY|LIMITED|PRIVATE)\b\.?')
+
+
+# Read and preprocess the Excel data
+def read_excel_data():
+    """Read the Excel data and derive the dashboard columns"""
+    df = pd.read_excel(DATA_FILE, sheet_name='Data', usecols=SOURCE_COLUMNS, dtype={'HS Code': str})
+
+    # Convert date column to datetime
+    df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y', errors='coerce')
+
+    # Create buyer column logic (vectorized over whole columns)
+    def stripped(col):
+        return df[col].fillna('').astype(str).str.strip()
+
+    # Remove common suffixes and clean names for comparison
+    def clean_name(names):
+        return names.str.upper().str.replace(COMPANY_SUFFIX_RE, '', regex=True).str.strip()
+
+    shipper = stripped('Shipper Declared')
+    intl_comp = stripped('International Competitor')
+    dom_comp = stripped('Domestic Competitor')
+
+    shipper_clean = clean_name(shipper)
+    intl_clean = clean_name(intl_comp)
+    dom_clean = clean_name(dom_comp)
+
+    # Logic: buyer is the one that's NOT the shipper
+    intl_present = intl_comp != ''
+    dom_present = dom_comp != ''
+    df['Buyer'] = np.select(
+        [intl_present & (intl_clean != shipper_clean),
+         dom_present & (dom_clean != shipper_clean),
+         intl_present,
+         dom_present],
+        [intl_comp, dom_comp, intl_comp, dom_comp],
+        default='Unknown'
+    )
+    df['Seller'] = df['Shipper Declared']
+
+    # Clean numeric columns
+    df['Metric Tons'] = pd.to_numeric(df['Metric Tons'], errors='coerce')
+    df['Total calculated value ($)'] = pd.to_numeric(df['Total calculated value ($)'], errors='coerce')
+    df['Val/KG ($)'] = pd.to_numeric(df['Val/KG ($)'], errors='coerce')
+
+    # Filter for only the 4 specific HS Codes (already read as text)
+    df = df.loc[df['HS Code'].isin(TARGET_HS_CODES), DATA_COLUMNS]
+
+    # Day of each row, floored once here so the time series groups on it without the time of day
+    df['Day'] = df['Date'].dt.floor('D')
+
+    # Store the text columns as categoricals so filters compare integer codes
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
+
+    return df
+
 
 # Load and preprocess data
 def load_data():
-    """Load and preprocess the Excel data"""
+    """Load the preprocessed data, from the Parquet cache while it is newer than the Excel file"""
     try:
-        df = pd.read_excel('PRY_Dash.xlsx', sheet_name='Data')
-
-        # Convert date column to datetime
-        df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y', errors='coerce')
-
-        # Create buyer column logic
-        def determine_buyer(row):
-            shipper = str(row['Shipper Declared']).strip() if pd.notna(row['Shipper Declared']) else ''
-            intl_comp = str(row['International Competitor']).strip() if pd.notna(
-                row['International Competitor']) else ''
-            dom_comp = str(row['Domestic Competitor']).strip() if pd.notna(row['Domestic Competitor']) else ''
-
-            # Remove common suffixes and clean names for comparison
-            def clean_name(name):
-                return re.sub(r'\b(LTD|LLC|INC|CO|COMPANY|LIMITED|PRIVATE)\b\.?', '', name.upper()).strip()
-
-            shipper_clean = clean_name(shipper)
-            intl_clean = clean_name(intl_comp)
-            dom_clean = clean_name(dom_comp)
-
-            # Logic: buyer is the one that's NOT the shipper
-            if intl_comp and intl_clean != shipper_clean:
-                return intl_comp
-            elif dom_comp and dom_clean != shipper_clean:
-                return dom_comp
-            elif intl_comp:
-                return intl_comp
-            elif dom_comp:
-                return dom_comp
-            else:
-                return 'Unknown'
-
-        df['Buyer'] = df.apply(determine_buyer, axis=1)
-        df['Seller'] = df['Shipper Declared']
-
-        # Clean numeric columns
-        df['Metric Tons'] = pd.to_numeric(df['Metric Tons'], errors='coerce')
-        df['Total calculated value ($)'] = pd.to_numeric(df['Total calculated value ($)'], errors='coerce')
-        df['Val/KG ($)'] = pd.to_numeric(df['Val/KG ($)'], errors='coerce')
-
-        # Filter for only the 4 specific HS Codes
-        target_hs_codes = ['854442', '854449', '854460', '740311']
-        df = df[df['HS Code'].astype(str).isin(target_hs_codes)]
+        if os.path.exists(CACHE_FILE) and os.path.getmtime(CACHE_FILE) >= os.path.getmtime(DATA_FILE):
+            try:
+                # Memory-mapped to skip copying the file into a read buffer; the DataFrame is still per process
+                return pd.read_parquet(CACHE_FILE, memory_map=True)
+            except Exception as e:
+                print(f"Error reading data cache: {e}")
+
+        df = read_excel_data()
+
+        try:
+            # Write then rename, so workers starting together never read a partial cache
+            tmp_file = f'{CACHE_FILE}.{os.getpid()}.tmp'
+            df.to_parquet(tmp_file)
+            os.replace(tmp_file, CACHE_FILE)
+        except Exception as e:
+            print(f"Error writing data cache: {e}")
 
         return df
     except Exception as e:
@@ -82,17 +209,175 @@ def load_data():
 # Simple date parser for MM/DD/YYYY format
 def parse_date_simple(date_string):
     """Parse MM/DD/YYYY format only"""
-    if not date_string:
+    match = DATE_INPUT_RE.fullmatch(date_string.strip()) if date_string else None
+    if not match:
         return None
+    month, day, year = map(int, match.groups())
     try:
-        return datetime.strptime(date_string.strip(), '%m/%d/%Y').date()
-    except:
+        return date(year, month, day)
+    except ValueError:
+        # Well-formed but impossible dates such as 02/30/2024
         return None
 
 
+# Normalize the raw filter inputs into a hashable key
+def normalize_filters(start_date, end_date, buyer, seller, hs_code, country, category):
+    """Parse the MM/DD/YYYY dates and map cleared dropdowns to None"""
+    return (parse_date_simple(start_date), parse_date_simple(end_date),
+            buyer or None, seller or None, hs_code or None, country or None, category or None)
+
+
+# Convert normalized filters to and from the JSON data held by the filter-state store
+def filters_to_state(filters):
+    """Serialize the normalized filters, with the dates as ISO strings"""
+    return [value.isoformat() if isinstance(value, date) else value for value in filters]
+
+
+def filters_from_state(state):
+    """Rebuild the normalized filters from the filter-state data"""
+    start_date, end_date, *values = state
+    return (date.fromisoformat(start_date) if start_date else None,
+            date.fromisoformat(end_date) if end_date else None, *values)
+
+
+# Filter the loaded data with one combined mask
+def filter_data(start_parsed, end_parsed, buyer, seller, hs_code, country, category):
+    """Return the rows of df matching every active filter"""
+    # Resolve the selected values to category codes and their row positions
+    selected = []
+    for col, value in (('Buyer', buyer), ('Seller', seller), ('HS Code', hs_code),
+                       ('Country of Origin', country), ('Category', category)):
+        if value:
+            if value not in FILTER_ROWS[col]:
+                return df.iloc[:0]
+            selected.append((col, df[col].cat.categories.get_loc(value), FILTER_ROWS[col][value]))
+
+    # Only scan the rows of the most selective value, or every row without one
+    rows = min((positions for _, _, positions in selected), key=len) if selected else None
+
+    def column(values):
+        return values if rows is None else values[rows]
+
+    # Date filtering compared as datetime64 days
+    dates = column(df['Date'].values)
+    mask = np.ones(len(dates), dtype=bool)
+
+    if start_parsed:
+        mask &= dates >= np.datetime64(start_parsed, 'D')
+
+    if end_parsed:
+        # Up to the end of the given day
+        mask &= dates < np.datetime64(end_parsed, 'D') + 1
+
+    # Apply other filters on the raw category codes
+    for col, code, _ in selected:
+        mask &= column(FILTER_CODES[col]) == code
+
+    return df[mask] if rows is None else df.iloc[rows[mask]]
+
+
+# Chart layout with a title
+def get_chart_layout(title):
+    """Return the shared chart template with the given title"""
+    return {**CHART_LAYOUT, 'title': {'text': title, 'font': CHART_TITLE_FONT}}
+
+
+# Per-category sums or row counts, accumulated over the category codes without hashing
+def category_totals(frame, key, value_col=None):
+    """Return the value_col sum (or the row count) for each category of key present in frame"""
+    categories = frame[key].cat.categories
+    codes = frame[key].cat.codes.to_numpy()
+    present = codes >= 0
+    codes = codes[present]
+
+    counts = np.bincount(codes, minlength=len(categories))
+    if value_col is None:
+        totals = counts
+    else:
+        # NaN values are skipped, as in a groupby sum
+        values = np.nan_to_num(frame[value_col].to_numpy()[present], nan=0.0)
+        totals = np.bincount(codes, weights=values, minlength=len(categories))
+
+    observed = counts > 0
+    return pd.Series(totals[observed], index=categories[observed])
+
+
+# Top entries of a group aggregate without sorting every group
+def top_n(totals, n):
+    """Return the n largest entries of totals, largest first"""
+    values = totals.to_numpy()
+    # Keep every entry that reaches the cutoff, in index order, so ties resolve like nlargest
+    if len(values) > n:
+        positions = np.flatnonzero(values >= np.partition(values, -n)[-n])
+    else:
+        positions = np.arange(len(values))
+    return totals.iloc[positions[np.argsort(-values[positions], kind='stable')][:n]]
+
+
+# Blank chart with only the shared template, built once per title
+@functools.lru_cache(maxsize=16)
+def empty_figure(title):
+    """Return the serialized empty figure for a chart title"""
+    fig = go.Figure()
+    fig.update_layout(get_chart_layout(title))
+    return figure_json(fig)
+
+
+# Largest-Triangle-Three-Buckets downsampling for long time series
+def lttb_indices(x, y, n_out):
+    """Return the indices of n_out points that keep the visual shape of the (x, y) line"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # The first and last points are kept, the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's average
+        area = np.abs((x[selected] - next_x) * (y[start:end] - y[selected])
+                      - (x[selected] - x[start:end]) * (next_y - y[selected]))
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+
+    return indices
+
+
+# Serialize a figure once into plain JSON data so cached outputs skip Plotly's encoder
+def figure_json(fig):
+    """Return the figure as the plain dict Dash sends to the browser"""
+    return orjson.loads(pio.to_json(fig, validate=False))
+
+
 # Load data
 df = load_data()
 
+# Version of the loaded data, part of every memoized key so a new data file never reuses old results
+DATA_VERSION = f'{CACHE_VERSION}-{os.path.getmtime(DATA_FILE)}' if os.path.exists(DATA_FILE) else str(CACHE_VERSION)
+
+# Category codes per filter column, compared directly by filter_data
+FILTER_CODES = {} if df.empty else {col: df[col].cat.codes.to_numpy() for col in CATEGORY_COLUMNS}
+
+# Row positions per value of each filter column, so a selection starts from its own rows
+FILTER_ROWS = {} if df.empty else {
+    col: df.groupby(col, observed=True, sort=False).indices for col in CATEGORY_COLUMNS
+}
+
+# Sorted dropdown labels per filter column, indexed by category code
+DROPDOWN_VALUES = {} if df.empty else {
+    col: df[col].cat.categories.astype(str).to_numpy() for col in CATEGORY_COLUMNS
+}
+
 # Custom CSS styling
 app.index_string = '''
 <!DOCTYPE html>
@@ -328,9 +613,8 @@ app.layout = html.Div([
     html.Div([
         html.Div([
             # Prysmian Logo
-            html.Img(src='data:image/png;base64,{}'.format(
-                __import__('base64').b64encode(open('PRY_Logo.png', 'rb').read()).decode()
-            ), className='logo', style={'height': '50px', 'marginRight': '20px'}),
+            html.Img(src=app.get_asset_url('PRY_Logo.png'), className='logo',
+                     style={'height': '50px', 'marginRight': '20px'}),
             html.H1("Maritime Imports Dashboard",
                     style={'color': COLORS['light_gray'], 'fontSize': '36px',
                            'fontWeight': '300', 'margin': '0', 'fontFamily': 'Montserrat'})
@@ -475,6 +759,13 @@ app.layout = html.Div([
     # Key Metrics Row - RIGHT BELOW FILTERS
     html.Div(id='metrics-row', style={'margin': '20px 0'}),
 
+    # Shown while a background dashboard update is running
+    html.Div("⏳ Updating dashboard...", id='dashboard-loading',
+             style=DASHBOARD_LOADING_STYLE),
+
+    # Applied filters, kept per browser session - the heavy callbacks only listen to this
+    dcc.Store(id='filter-state'),
+
     # Charts Section - ALL AT THE BOTTOM
     html.Div([
         # Volume Chart
@@ -532,9 +823,14 @@ app.layout = html.Div([
                         'backgroundColor': COLORS['dark_gray']
                     }
                 ],
+                page_current=0,
                 page_size=15,
-                sort_action='native',
-                filter_action='native'
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                filter_action='custom',
+                filter_query=''
             )
         ], className='chart-container')
     ])
@@ -605,101 +901,42 @@ def handle_resets(global_reset, start_reset, end_reset, buyer_reset, seller_rese
     return current_start, current_end, current_buyer, current_seller, current_hs, current_country, current_category
 
 
-# Progressive Filtering - Update dropdown options with AUTO-POPULATE for single options
-@app.callback(
-    [Output('buyer-filter', 'options'),
-     Output('seller-filter', 'options'),
-     Output('hs-code-filter', 'options'),
-     Output('country-filter', 'options'),
-     Output('category-filter', 'options')],
-    [Input('date-go-btn', 'n_clicks'),
-     Input('buyer-go-btn', 'n_clicks'),
-     Input('seller-go-btn', 'n_clicks'),
-     Input('hs-go-btn', 'n_clicks'),
-     Input('country-go-btn', 'n_clicks'),
-     Input('category-go-btn', 'n_clicks'),
-     Input('global-reset-btn', 'n_clicks')],
-    [State('start-date', 'value'),
-     State('end-date', 'value'),
-     State('buyer-filter', 'value'),
-     State('seller-filter', 'value'),
-     State('hs-code-filter', 'value'),
-     State('country-filter', 'value'),
-     State('category-filter', 'value')],
-    prevent_initial_call=True
-)
-def update_dropdown_options(date_clicks, buyer_clicks, seller_clicks, hs_clicks,
-                            country_clicks, category_clicks, reset_clicks,
-                            start_date, end_date, buyer, seller, hs_code, country, category):
+# Dropdown options for a normalized filter key, memoized across clicks
+@cache.memoize(timeout=CACHE_TIMEOUT)
+def compute_dropdown_options(data_version, start_parsed, end_parsed, buyer, seller, hs_code, country, category):
+    """Build the dropdown options left by the given filters"""
     if df.empty:
         return [], [], [], [], []
 
-    # Start with full dataset
-    filtered_df = df.copy()
-
-    # Apply date filter if dates are provided
-    if start_date:
-        start_parsed = parse_date_simple(start_date)
-        if start_parsed:
-            filtered_df = filtered_df[filtered_df['Date'].dt.date >= start_parsed]
-
-    if end_date:
-        end_parsed = parse_date_simple(end_date)
-        if end_parsed:
-            filtered_df = filtered_df[filtered_df['Date'].dt.date <= end_parsed]
+    # Apply filters progressively
+    filtered_df = filter_data(start_parsed, end_parsed, buyer, seller, hs_code, country, category)
 
-    # Apply other filters progressively
-    if buyer:
-        filtered_df = filtered_df[filtered_df['Buyer'].astype(str) == str(buyer)]
+    # Generate options based on filtered data - pick the precomputed sorted labels whose codes are present
+    def present_values(col):
+        values = DROPDOWN_VALUES[col]
+        codes = filtered_df[col].cat.codes.values
+        present = np.bincount(codes[codes >= 0], minlength=len(values)) > 0
+        return values[present]
 
-    if seller:
-        filtered_df = filtered_df[filtered_df['Seller'].astype(str) == str(seller)]
+    buyer_options = [{'label': buyer, 'value': buyer} for buyer in present_values('Buyer') if buyer != 'Unknown']
 
-    if hs_code:
-        filtered_df = filtered_df[filtered_df['HS Code'].astype(str) == str(hs_code)]
-
-    if country:
-        filtered_df = filtered_df[filtered_df['Country of Origin'].astype(str) == str(country)]
-
-    if category:
-        filtered_df = filtered_df[filtered_df['Category'].astype(str) == str(category)]
-
-    # Generate options based on filtered data
-    buyers = filtered_df['Buyer'].dropna().unique()
-    buyers_str = [str(buyer) for buyer in buyers if str(buyer) != 'Unknown']
-    buyer_options = [{'label': buyer, 'value': buyer} for buyer in sorted(buyers_str)]
-
-    sellers = filtered_df['Seller'].dropna().unique()
-    sellers_str = [str(seller) for seller in sellers]
-    seller_options = [{'label': seller, 'value': seller} for seller in sorted(sellers_str)]
+    seller_options = [{'label': seller, 'value': seller} for seller in present_values('Seller')]
 
     # Only show the 4 specific HS codes that exist in filtered data
-    target_hs_codes = ['854442', '854449', '854460', '740311']
-    available_hs = filtered_df['HS Code'].astype(str).unique()
-    hs_codes = [code for code in target_hs_codes if code in available_hs]
+    available_hs = present_values('HS Code')
+    hs_codes = [code for code in TARGET_HS_CODES if code in available_hs]
     hs_options = [{'label': code, 'value': code} for code in sorted(hs_codes)]
 
-    countries = filtered_df['Country of Origin'].dropna().unique()
-    countries_str = [str(country) for country in countries]
-    country_options = [{'label': country, 'value': country} for country in sorted(countries_str)]
+    country_options = [{'label': country, 'value': country} for country in present_values('Country of Origin')]
 
-    categories = filtered_df['Category'].dropna().unique()
-    categories_str = [str(cat) for cat in categories]
-    category_options = [{'label': cat, 'value': cat} for cat in sorted(categories_str)]
+    category_options = [{'label': cat, 'value': cat} for cat in present_values('Category')]
 
     return buyer_options, seller_options, hs_options, country_options, category_options
 
 
-# Main Dashboard Update Callback
+# Apply Filters Callback - record the applied filters once per click
 @app.callback(
-    [Output('metrics-row', 'children'),
-     Output('volume-chart', 'figure'),
-     Output('value-chart', 'figure'),
-     Output('category-chart', 'figure'),
-     Output('country-chart', 'figure'),
-     Output('time-series-chart', 'figure'),
-     Output('data-table', 'columns'),
-     Output('data-table', 'data')],
+    Output('filter-state', 'data'),
     [Input('date-go-btn', 'n_clicks'),
      Input('buyer-go-btn', 'n_clicks'),
      Input('seller-go-btn', 'n_clicks'),
@@ -713,219 +950,334 @@ def update_dropdown_options(date_clicks, buyer_clicks, seller_clicks, hs_clicks,
      State('seller-filter', 'value'),
      State('hs-code-filter', 'value'),
      State('country-filter', 'value'),
-     State('category-filter', 'value')]
+     State('category-filter', 'value'),
+     State('filter-state', 'data')]
 )
-def update_dashboard(date_clicks, buyer_clicks, seller_clicks, hs_clicks,
-                     country_clicks, category_clicks, reset_clicks,
-                     start_date, end_date, buyer, seller, hs_code, country, category):
-    if df.empty:
-        return [html.Div("No data available")], {}, {}, {}, {}, {}, [], []
+def apply_filters(date_clicks, buyer_clicks, seller_clicks, hs_clicks,
+                  country_clicks, category_clicks, reset_clicks,
+                  start_date, end_date, buyer, seller, hs_code, country, category, current_state):
+    ctx = callback_context
 
-    # Filter data
-    filtered_df = df.copy()
+    # The reset clears the filter values in the same round trip, so don't read them back
+    if ctx.triggered and ctx.triggered[0]['prop_id'].split('.')[0] == 'global-reset-btn':
+        filters = normalize_filters('', '', None, None, None, None, None)
+    else:
+        filters = normalize_filters(start_date, end_date, buyer, seller, hs_code, country, category)
 
-    # Date filtering with simple MM/DD/YYYY parsing
-    if start_date:
-        start_parsed = parse_date_simple(start_date)
-        if start_parsed:
-            filtered_df = filtered_df[filtered_df['Date'].dt.date >= start_parsed]
+    # Leave the store untouched when the applied filters did not change
+    state = filters_to_state(filters)
+    if state == current_state:
+        return dash.no_update
 
-    if end_date:
-        end_parsed = parse_date_simple(end_date)
-        if end_parsed:
-            filtered_df = filtered_df[filtered_df['Date'].dt.date <= end_parsed]
+    return state
 
-    # Apply other filters
-    if buyer:
-        filtered_df = filtered_df[filtered_df['Buyer'].astype(str) == str(buyer)]
 
-    if seller:
-        filtered_df = filtered_df[filtered_df['Seller'].astype(str) == str(seller)]
+# Progressive Filtering - Update dropdown options with AUTO-POPULATE for single options
+@app.callback(
+    [Output('buyer-filter', 'options'),
+     Output('seller-filter', 'options'),
+     Output('hs-code-filter', 'options'),
+     Output('country-filter', 'options'),
+     Output('category-filter', 'options')],
+    Input('filter-state', 'data'),
+    prevent_initial_call=True
+)
+def update_dropdown_options(filter_state):
+    return compute_dropdown_options(DATA_VERSION, *filters_from_state(filter_state))
+
 
-    if hs_code:
-        filtered_df = filtered_df[filtered_df['HS Code'].astype(str) == str(hs_code)]
+# Dashboard outputs for a normalized filter key, memoized across clicks and workers
+@cache.memoize(timeout=CACHE_TIMEOUT)
+def compute_dashboard(data_version, start_parsed, end_parsed, buyer, seller, hs_code, country, category):
+    """Build the metrics, charts and table for the given filters"""
+    if df.empty:
+        return [html.Div("No data available")], {}, {}, {}, {}, {}, []
 
-    if country:
-        filtered_df = filtered_df[filtered_df['Country of Origin'].astype(str) == str(country)]
+    # Filter data
+    filtered_df = filter_data(start_parsed, end_parsed, buyer, seller, hs_code, country, category)
 
-    if category:
-        filtered_df = filtered_df[filtered_df['Category'].astype(str) == str(category)]
+    # Daily sums in one pass, keeping undated rows so the metrics can be totalled from them
+    daily_totals = filtered_df.groupby('Day', dropna=False).agg(
+        value=('Total calculated value ($)', 'sum'),
+        volume=('Metric Tons', 'sum'),
+        price_sum=('Val/KG ($)', 'sum'),
+        price_count=('Val/KG ($)', 'count')
+    )
 
-    # Calculate metrics
+    # Calculate metrics from the daily sums
     total_transactions = len(filtered_df)
-    total_value = filtered_df['Total calculated value ($)'].sum()
-    total_volume = filtered_df['Metric Tons'].sum()
-    avg_price_per_kg = filtered_df['Val/KG ($)'].mean()
+    total_value = daily_totals['value'].sum()
+    total_volume = daily_totals['volume'].sum()
+    price_count = daily_totals['price_count'].sum()
+    avg_price_per_kg = float(daily_totals['price_sum'].sum() / price_count) if price_count else math.nan
 
     # Create metrics cards
     metrics = html.Div([
         html.Div([
-            html.H3(f"{total_transactions:,}",
-                    style={'color': COLORS['light_blue'], 'fontSize': '28px', 'margin': '0'}),
-            html.P("Total Transactions", style={'color': COLORS['light_gray'], 'margin': '5px 0'})
-        ], className='metric-card', style={'width': '22%', 'display': 'inline-block'}),
+            html.H3(f"{total_transactions:,}", style=METRIC_VALUE_STYLE_BLUE),
+            html.P("Total Transactions", style=METRIC_LABEL_STYLE)
+        ], className='metric-card', style=METRIC_CARD_STYLE),
 
         html.Div([
-            html.H3(f"${total_value:,.0f}", style={'color': COLORS['light_green'], 'fontSize': '28px', 'margin': '0'}),
-            html.P("Total Value", style={'color': COLORS['light_gray'], 'margin': '5px 0'})
-        ], className='metric-card', style={'width': '22%', 'display': 'inline-block'}),
+            html.H3(f"${total_value:,.0f}", style=METRIC_VALUE_STYLE_GREEN),
+            html.P("Total Value", style=METRIC_LABEL_STYLE)
+        ], className='metric-card', style=METRIC_CARD_STYLE),
 
         html.Div([
-            html.H3(f"{total_volume:,.1f}", style={'color': COLORS['light_blue'], 'fontSize': '28px', 'margin': '0'}),
-            html.P("Metric Tons", style={'color': COLORS['light_gray'], 'margin': '5px 0'})
-        ], className='metric-card', style={'width': '22%', 'display': 'inline-block'}),
+            html.H3(f"{total_volume:,.1f}", style=METRIC_VALUE_STYLE_BLUE),
+            html.P("Metric Tons", style=METRIC_LABEL_STYLE)
+        ], className='metric-card', style=METRIC_CARD_STYLE),
 
         html.Div([
-            html.H3(f"${avg_price_per_kg:.2f}" if not pd.isna(avg_price_per_kg) else "N/A",
-                    style={'color': COLORS['light_green'], 'fontSize': '28px', 'margin': '0'}),
-            html.P("Avg Price/KG", style={'color': COLORS['light_gray'], 'margin': '5px 0'})
-        ], className='metric-card', style={'width': '22%', 'display': 'inline-block'})
+            html.H3(f"${avg_price_per_kg:.2f}" if not math.isnan(avg_price_per_kg) else "N/A",
+                    style=METRIC_VALUE_STYLE_GREEN),
+            html.P("Avg Price/KG", style=METRIC_LABEL_STYLE)
+        ], className='metric-card', style=METRIC_CARD_STYLE)
     ])
 
-    # Chart template
-    def get_chart_layout(title):
-        return {
-            'plot_bgcolor': COLORS['night_black'],
-            'paper_bgcolor': COLORS['night_black'],
-            'font': {'color': COLORS['light_gray'], 'family': 'Montserrat'},
-            'title': {'text': title, 'font': {'color': COLORS['light_blue'], 'size': 18, 'family': 'Montserrat'}},
-            'xaxis': {'gridcolor': COLORS['dark_gray']},
-            'yaxis': {'gridcolor': COLORS['dark_gray']}
-        }
+    # Nothing to chart - every figure is the cached empty one for its title
+    if filtered_df.empty:
+        return (metrics, *(empty_figure(title) for title in CHART_TITLES), [])
+
+    volume_title, value_title, category_title, country_title, time_title = CHART_TITLES
+    dark_gray, light_blue, light_green = COLORS['dark_gray'], COLORS['light_blue'], COLORS['light_green']
 
     # Volume by Buyer Chart
-    if not filtered_df.empty:
-        top_buyers = filtered_df.groupby('Buyer')['Metric Tons'].sum().nlargest(10)
-        volume_fig = px.bar(
-            x=top_buyers.values,
-            y=top_buyers.index,
-            orientation='h',
-            title="Top 10 Buyers by Volume",
-            color=top_buyers.values,
-            color_continuous_scale=[[0, COLORS['dark_gray']], [1, COLORS['light_blue']]]
-        )
-        volume_fig.update_layout(get_chart_layout("🏭 Top 10 Buyers by Volume"))
-    else:
-        volume_fig = go.Figure()
-        volume_fig.update_layout(get_chart_layout("🏭 Top 10 Buyers by Volume"))
+    top_buyers = top_n(category_totals(filtered_df, 'Buyer', 'Metric Tons'), 10)
+    volume_fig = go.Figure(go.Bar(
+        x=top_buyers.to_numpy(),
+        y=top_buyers.index.to_numpy(),
+        orientation='h',
+        marker={'color': top_buyers.to_numpy(), 'showscale': True,
+                'colorscale': [[0, dark_gray], [1, light_blue]]}
+    ))
+    volume_fig.update_layout(get_chart_layout(volume_title))
 
     # Value by Seller Chart
-    if not filtered_df.empty:
-        top_sellers = filtered_df.groupby('Seller')['Total calculated value ($)'].sum().nlargest(10)
-        value_fig = px.bar(
-            x=top_sellers.values,
-            y=top_sellers.index,
-            orientation='h',
-            title="Top 10 Sellers by Value",
-            color=top_sellers.values,
-            color_continuous_scale=[[0, COLORS['dark_gray']], [1, COLORS['light_green']]]
-        )
-        value_fig.update_layout(get_chart_layout("💰 Top 10 Sellers by Value"))
-    else:
-        value_fig = go.Figure()
-        value_fig.update_layout(get_chart_layout("💰 Top 10 Sellers by Value"))
+    top_sellers = top_n(category_totals(filtered_df, 'Seller', 'Total calculated value ($)'), 10)
+    value_fig = go.Figure(go.Bar(
+        x=top_sellers.to_numpy(),
+        y=top_sellers.index.to_numpy(),
+        orientation='h',
+        marker={'color': top_sellers.to_numpy(), 'showscale': True,
+                'colorscale': [[0, dark_gray], [1, light_green]]}
+    ))
+    value_fig.update_layout(get_chart_layout(value_title))
 
     # Category Distribution - TOP 5 ONLY WITH DISTINCT COLORS (PURPLE INSTEAD OF PINK)
-    if not filtered_df.empty:
-        category_dist = filtered_df['Category'].value_counts().head(5)
-
-        category_colors = [
-            COLORS['light_blue'],
-            COLORS['light_green'],
-            '#8A2BE2',  # MODERATE PURPLE (instead of pink)
-            '#4ECDC4',  # Teal
-            '#45B7D1'  # Sky Blue
-        ]
-
-        category_fig = px.pie(
-            values=category_dist.values,
-            names=category_dist.index,
-            title="Top 5 Categories Distribution",
-            color_discrete_sequence=category_colors
-        )
-        category_fig.update_layout(get_chart_layout("📦 Top 5 Categories Distribution"))
-    else:
-        category_fig = go.Figure()
-        category_fig.update_layout(get_chart_layout("📦 Top 5 Categories Distribution"))
+    category_dist = top_n(category_totals(filtered_df, 'Category'), 5)
+
+    category_colors = [
+        light_blue,
+        light_green,
+        '#8A2BE2',  # MODERATE PURPLE (instead of pink)
+        '#4ECDC4',  # Teal
+        '#45B7D1'  # Sky Blue
+    ]
+
+    category_fig = go.Figure(go.Pie(
+        values=category_dist.to_numpy(),
+        labels=category_dist.index.to_numpy(),
+        marker={'colors': category_colors}
+    ))
+    category_fig.update_layout(get_chart_layout(category_title))
 
     # Country Distribution
-    if not filtered_df.empty:
-        country_dist = filtered_df['Country of Origin'].value_counts().head(10)
-        country_fig = px.bar(
-            x=country_dist.index,
-            y=country_dist.values,
-            title="Top 10 Countries by Transaction Count",
-            color=country_dist.values,
-            color_continuous_scale=[[0, COLORS['dark_gray']], [1, COLORS['light_blue']]]
-        )
-        country_fig.update_layout(get_chart_layout("🌍 Top 10 Countries by Transaction Count"))
-        country_fig.update_xaxes(tickangle=45)
-    else:
-        country_fig = go.Figure()
-        country_fig.update_layout(get_chart_layout("🌍 Top 10 Countries by Transaction Count"))
+    country_dist = top_n(category_totals(filtered_df, 'Country of Origin'), 10)
+    country_fig = go.Figure(go.Bar(
+        x=country_dist.index.to_numpy(),
+        y=country_dist.to_numpy(),
+        marker={'color': country_dist.to_numpy(), 'showscale': True,
+                'colorscale': [[0, dark_gray], [1, light_blue]]}
+    ))
+    country_fig.update_layout(get_chart_layout(country_title))
+    country_fig.update_xaxes(tickangle=45)
 
     # Time Series Chart
-    if not filtered_df.empty:
-        daily_stats = filtered_df.groupby(filtered_df['Date'].dt.date).agg({
-            'Total calculated value ($)': 'sum',
-            'Metric Tons': 'sum'
-        }).reset_index()
-
-        time_fig = go.Figure()
-        time_fig.add_trace(go.Scatter(
-            x=daily_stats['Date'],
-            y=daily_stats['Total calculated value ($)'],
-            mode='lines+markers',
-            name='Total Value ($)',
-            line=dict(color=COLORS['light_green'], width=3),
-            yaxis='y'
-        ))
-
-        time_fig.add_trace(go.Scatter(
-            x=daily_stats['Date'],
-            y=daily_stats['Metric Tons'],
-            mode='lines+markers',
-            name='Metric Tons',
-            line=dict(color=COLORS['light_blue'], width=3),
-            yaxis='y2'
-        ))
-
-        time_fig.update_layout(
-            get_chart_layout("📈 Trade Volume & Value Over Time"),
-            yaxis=dict(title='Total Value ($)', side='left', color=COLORS['light_green']),
-            yaxis2=dict(title='Metric Tons', side='right', overlaying='y', color=COLORS['light_blue']),
-            hovermode='x unified'
-        )
-    else:
-        time_fig = go.Figure()
-        time_fig.update_layout(get_chart_layout("📈 Trade Volume & Value Over Time"))
+    daily_stats = daily_totals[daily_totals.index.notna()].reset_index()
+    day_numbers = daily_stats['Day'].to_numpy().astype('int64')
+    # Both traces share the union of their downsampled days so the unified hover lines up
+    daily_stats = daily_stats.iloc[np.union1d(
+        lttb_indices(day_numbers, daily_stats['value'], TIME_SERIES_POINTS),
+        lttb_indices(day_numbers, daily_stats['volume'], TIME_SERIES_POINTS))]
+
+    time_fig = go.Figure()
+    time_fig.add_trace(go.Scattergl(
+        x=daily_stats['Day'],
+        y=daily_stats['value'],
+        mode='lines+markers',
+        name='Total Value ($)',
+        line=dict(color=light_green, width=3),
+        yaxis='y'
+    ))
+
+    time_fig.add_trace(go.Scattergl(
+        x=daily_stats['Day'],
+        y=daily_stats['volume'],
+        mode='lines+markers',
+        name='Metric Tons',
+        line=dict(color=light_blue, width=3),
+        yaxis='y2'
+    ))
+
+    time_fig.update_layout(
+        get_chart_layout(time_title),
+        yaxis=dict(title='Total Value ($)', side='left', color=light_green),
+        yaxis2=dict(title='Metric Tons', side='right', overlaying='y', color=light_blue),
+        hovermode='x unified'
+    )
 
     # Data Table
-    if not filtered_df.empty:
-        table_columns = [
-            {'name': 'Date', 'id': 'Date', 'type': 'datetime'},
-            {'name': 'Buyer', 'id': 'Buyer'},
-            {'name': 'Seller', 'id': 'Seller'},
-            {'name': 'Country', 'id': 'Country of Origin'},
-            {'name': 'HS Code', 'id': 'HS Code'},
-            {'name': 'Category', 'id': 'Category'},
-            {'name': 'Metric Tons', 'id': 'Metric Tons', 'type': 'numeric', 'format': {'specifier': '.2f'}},
-            {'name': 'Total Value ($)', 'id': 'Total calculated value ($)', 'type': 'numeric',
-             'format': {'specifier': '$,.0f'}},
-            {'name': 'Val/KG ($)', 'id': 'Val/KG ($)', 'type': 'numeric', 'format': {'specifier': '$.2f'}}
-        ]
-
-        table_data = filtered_df[['Date', 'Buyer', 'Seller', 'Country of Origin', 'HS Code',
-                                  'Category', 'Metric Tons', 'Total calculated value ($)', 'Val/KG ($)']].to_dict(
-            'records')
+    table_columns = [
+        {'name': 'Date', 'id': 'Date', 'type': 'datetime'},
+        {'name': 'Buyer', 'id': 'Buyer'},
+        {'name': 'Seller', 'id': 'Seller'},
+        {'name': 'Country', 'id': 'Country of Origin'},
+        {'name': 'HS Code', 'id': 'HS Code'},
+        {'name': 'Category', 'id': 'Category'},
+        {'name': 'Metric Tons', 'id': 'Metric Tons', 'type': 'numeric', 'format': {'specifier': '.2f'}},
+        {'name': 'Total Value ($)', 'id': 'Total calculated value ($)', 'type': 'numeric',
+         'format': {'specifier': '$,.0f'}},
+        {'name': 'Val/KG ($)', 'id': 'Val/KG ($)', 'type': 'numeric', 'format': {'specifier': '$.2f'}}
+    ]
+
+    return (metrics, figure_json(volume_fig), figure_json(value_fig), figure_json(category_fig),
+            figure_json(country_fig), figure_json(time_fig), table_columns)
+
+
+# Main Dashboard Update Callback
+@app.callback(
+    [Output('metrics-row', 'children'),
+     Output('volume-chart', 'figure'),
+     Output('value-chart', 'figure'),
+     Output('category-chart', 'figure'),
+     Output('country-chart', 'figure'),
+     Output('time-series-chart', 'figure'),
+     Output('data-table', 'columns')],
+    Input('filter-state', 'data'),
+    prevent_initial_call=True,
+    **BACKGROUND_CALLBACK
+)
+def update_dashboard(filter_state):
+    return compute_dashboard(DATA_VERSION, *filters_from_state(filter_state))
+
+
+# Missing cells of a table column - blank also counts empty or whitespace-only text
+def table_missing_mask(column, blank):
+    """Return the boolean mask of missing (or, with blank, empty text) cells in column"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        labels = column.cat.categories.astype(str)
+        empty = labels.str.strip() == '' if blank else np.zeros(len(labels), dtype=bool)
+        # Missing values (code -1) pick the trailing True
+        return np.append(empty, True)[column.cat.codes.to_numpy()]
+
+    matches = column.isna().to_numpy()
+    if blank and column.dtype == object:
+        matches |= column.astype(str).str.strip().to_numpy() == ''
+    return matches
+
+
+# Match one DataTable filter expression such as `{Metric Tons} > 10` or `{Buyer} icontains acme`
+def table_filter_mask(filtered_df, filter_part):
+    """Return the boolean mask of rows matching a single custom DataTable filter expression"""
+    missing = TABLE_FILTER_MISSING_RE.fullmatch(filter_part.strip())
+    if missing and missing.group('column') in filtered_df.columns:
+        matches = table_missing_mask(filtered_df[missing.group('column')], missing.group('check') == 'blank')
+        return ~matches if missing.group('negate') else matches
+
+    # An expression that can't be evaluated matches nothing rather than silently showing every row
+    match = TABLE_FILTER_RE.fullmatch(filter_part.strip())
+    if not match or match.group('column') not in filtered_df.columns:
+        return np.zeros(len(filtered_df), dtype=bool)
+
+    col, operator, value = match.group('column'), match.group('operator'), match.group('value').strip()
+    ignore_case = match.group('case') == 'i'
+
+    # Strip the quotes DataTable puts around text values
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'`':
+        value = value[1:-1]
+
+    column = filtered_df[col]
+    codes = None
+    if pd.api.types.is_numeric_dtype(column) and operator not in ('contains', 'datestartswith'):
+        value = pd.to_numeric(value, errors='coerce')
+    elif col == 'Date' and operator != 'datestartswith':
+        value = pd.to_datetime(value, errors='coerce')
+    else:
+        # Text comparison on the displayed values - categoricals compare each label once, looked up by code
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            column = pd.Series(column.cat.categories.astype(str))
+        else:
+            column = column.astype(str)
+        if ignore_case:
+            column, value = column.str.lower(), value.lower()
+
+    if operator == 'contains':
+        matches = column.str.contains(value, regex=False)
+    elif operator == 'datestartswith':
+        matches = column.str.startswith(value)
+    elif pd.isna(value):
+        return np.zeros(len(filtered_df), dtype=bool)
     else:
-        table_columns = []
-        table_data = []
+        matches = getattr(column, TABLE_FILTER_COMPARISONS[operator])(value)
+
+    matches = matches.to_numpy(dtype=bool)
+    if codes is not None:
+        # Missing values (code -1) pick the trailing False
+        matches = np.append(matches, False)[codes]
+
+    return matches
+
+
+# Data Table Page Callback - only the visible page is sent to the browser
+@app.callback(
+    [Output('data-table', 'data'),
+     Output('data-table', 'page_count'),
+     Output('data-table', 'page_current')],
+    [Input('filter-state', 'data'),
+     Input('data-table', 'page_current'),
+     Input('data-table', 'page_size'),
+     Input('data-table', 'sort_by'),
+     Input('data-table', 'filter_query')]
+)
+def update_table_page(filter_state, page_current, page_size, sort_by, filter_query):
+    if df.empty or filter_state is None:
+        return [], 0, 0
+
+    filtered_df = filter_data(*filters_from_state(filter_state))
+
+    # Combine every table filter into one mask and index once
+    filter_parts = [part for part in (filter_query or '').split(' && ') if part.strip()]
+    if filter_parts:
+        mask = np.ones(len(filtered_df), dtype=bool)
+        for filter_part in filter_parts:
+            mask &= table_filter_mask(filtered_df, filter_part)
+        filtered_df = filtered_df[mask]
+
+    # New filters or a new sort start over from the first page, otherwise stay within the page count
+    page_count = max(1, -(-len(filtered_df) // page_size))
+    ctx = callback_context
+    if ctx.triggered and ctx.triggered[0]['prop_id'] != 'data-table.page_current':
+        page_current = 0
+    page_current = min(page_current or 0, page_count - 1)
+    page_rows = slice(page_current * page_size, (page_current + 1) * page_size)
+
+    # Only the sort column is reordered, then just the rows of the requested page are taken
+    if sort_by and sort_by[0]['column_id'] in filtered_df.columns:
+        order = filtered_df[sort_by[0]['column_id']].sort_values(
+            ascending=sort_by[0]['direction'] == 'asc', kind='stable').index
+        page = filtered_df.loc[order[page_rows]]
+    else:
+        page = filtered_df.iloc[page_rows]
+
+    # Build the records from whole columns instead of boxing each cell through to_dict('records')
+    column_values = [page[col].tolist() for col in DATA_COLUMNS]
+    table_data = [dict(zip(DATA_COLUMNS, row)) for row in zip(*column_values)]
 
-    return metrics, volume_fig, value_fig, category_fig, country_fig, time_fig, table_columns, table_data
+    return table_data, page_count, page_current
 
 
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get('PORT', 8050))
     app.run(debug=False, host='0.0.0.0', port=port)
\ No newline at end of file